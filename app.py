@@ -1,13 +1,13 @@
 import streamlit as st
 from calculator_core import ESSSampleSizeCalculator, SurveyParameters
-import plotly.express as px
-import pandas as pd
+import plotly.graph_objects as go
+import numpy as np
 from auth_lib import authenticate_user
-import json
 
-# Initialize components
-calculator = ESSSampleSizeCalculator()
-authenticate_user()
+@st.cache_resource
+def get_calculator() -> ESSSampleSizeCalculator:
+    """Calculator shared across reruns and sessions"""
+    return ESSSampleSizeCalculator()
 
 # --- Page Config ---
 st.set_page_config(
@@ -17,9 +17,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Initialize components (after set_page_config: a cold cache draws a spinner)
+calculator = get_calculator()
+authenticate_user()
+
 # --- CSS Styling ---
-with open("style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+@st.cache_data
+def _load_css(path: str) -> str:
+    """Read a static stylesheet once instead of on every rerun"""
+    with open(path) as f:
+        return f.read()
+
+st.markdown(f"<style>{_load_css('style.css')}</style>", unsafe_allow_html=True)
 
 # --- Main UI ---
 def main():
@@ -31,15 +40,15 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
-    # Survey selection
-    survey_type = st.selectbox(
-        "Select Survey Type",
-        options=calculator.get_survey_types(),
-        format_func=lambda x: x['name'],
-        help="Choose the survey type from ESS standards"
-    )
-
     with st.form("parameters"):
+        # Survey selection (inside the form so changes wait for submit)
+        survey_type = st.selectbox(
+            "Select Survey Type",
+            options=calculator.get_survey_types(),
+            format_func=lambda x: x['name'],
+            help="Choose the survey type from ESS standards"
+        )
+
         col1, col2 = st.columns(2)
         
         with col1:
@@ -121,9 +130,81 @@ def main():
             )
             
             results = calculator.calculate_sample(params)
-            display_results(results)
+            display_results(results, params)
+
+@st.cache_data
+def _deff_curve(cluster_size: int):
+    """Design effect across the ICC sensitivity range (0.01 - 0.30)"""
+    icc_range = np.arange(1, 31) / 100
+    deff_values = 1.0 + (cluster_size - 1) * icc_range
+    return icc_range, deff_values
+
+def _build_progression_fig(base: int, adj: int, final: int):
+    """Bar chart of the sample size at each calculation stage"""
+    fig = go.Figure(go.Bar(
+        x=["Simple Random", "Cluster Adjusted", "With Non-Response"],
+        y=[base, adj, final],
+        marker_color=["#4CAF50", "#FFC107", "#2196F3"]
+    ))
+    fig.update_layout(
+        title="Sample Size Progression",
+        xaxis_title="Calculation Stage",
+        yaxis_title="Sample Size"
+    )
+    return fig
 
-def display_results(results: dict):
+def _build_deff_fig(cluster_size: int):
+    """Line chart of design effect against ICC for a given cluster size"""
+    icc_range, deff_values = _deff_curve(cluster_size)
+    fig = go.Figure(go.Scatter(x=icc_range, y=deff_values, mode='lines'))
+    fig.update_layout(
+        title="Design Effect vs ICC",
+        xaxis_title="ICC",
+        yaxis_title="Design Effect"
+    )
+    return fig
+
+@st.cache_data
+def _sensitivity_grid(confidence_level: int, prevalence: float,
+                      margin_error: float, population_size: int,
+                      non_response_rate: float):
+    """Final EAs needed over the ICC x cluster size grid"""
+    calc = get_calculator()
+    icc_range = np.arange(1, 31) / 100
+    cluster_sizes = np.arange(5, 51, 5)
+    batch = calc.calculate_sample_batch(
+        calc.confidence_levels[confidence_level],
+        prevalence,
+        margin_error,
+        cluster_sizes[np.newaxis, :],
+        icc_range[:, np.newaxis],
+        population_size,
+        non_response_rate
+    )
+    return icc_range, cluster_sizes, batch['final_n']
+
+def _build_sensitivity_heatmap(confidence_level: int, prevalence: float,
+                               margin_error: float, population_size: int,
+                               non_response_rate: float):
+    """Heatmap of final EAs needed over the ICC x cluster size grid"""
+    icc_range, cluster_sizes, final_n = _sensitivity_grid(
+        confidence_level, prevalence, margin_error,
+        population_size, non_response_rate
+    )
+    fig = go.Figure(go.Heatmap(
+        z=final_n,
+        x=cluster_sizes,
+        y=icc_range,
+        colorbar={"title": "Final EAs"}
+    ))
+    fig.update_layout(
+        title="Final Sample Size by ICC and Cluster Size",
+        xaxis_title="Households per EA",
+        yaxis_title="ICC"
+    )
+    return fig
+
+def display_results(results: dict, params: SurveyParameters):
     """Interactive results visualization"""
     st.markdown("## 📊 Results Summary")
     
@@ -131,7 +212,7 @@ def display_results(results: dict):
     cols = st.columns(3)
     metrics = [
         ("Base Sample (SRS)", results['base_sample_size']),
-        ("Design Effect", results['design_effect']),
+        ("Design Effect", round(results['design_effect'], 3)),
         ("Final EAs Needed", results['final_sample_size'])
     ]
     
@@ -140,35 +221,32 @@ def display_results(results: dict):
             st.metric(label, value)
     
     # Visualization
-    fig = px.bar(
-        x=["Simple Random", "Cluster Adjusted", "With Non-Response"],
-        y=[
-            results['base_sample_size'],
-            results['adjusted_sample_size'],
-            results['final_sample_size']
-        ],
-        labels={"x": "Calculation Stage", "y": "Sample Size"},
-        title="Sample Size Progression",
-        color_discrete_sequence=["#4CAF50", "#FFC107", "#2196F3"]
+    fig = _build_progression_fig(
+        results['base_sample_size'],
+        results['adjusted_sample_size'],
+        results['final_sample_size']
     )
     st.plotly_chart(fig, use_container_width=True)
     
     # DEFF explanation
     with st.expander("ℹ️ Design Effect Analysis"):
         st.markdown(f"""
-        - **ICC**: {results['icc']} (similarity within EAs)
+        - **ICC**: {round(results['icc'], 3)} (similarity within EAs)
         - **Cluster Size**: {results['cluster_size']} households/EA
         - **Variance Inflation**: {results['design_effect']:.2f}x
         """)
         
         # ICC sensitivity analysis
-        icc_range = [x/100 for x in range(1, 31)]
-        deff_values = [1 + (results['cluster_size'] - 1) * icc for icc in icc_range]
-        
-        fig = px.line(
-            x=icc_range, y=deff_values,
-            title="Design Effect vs ICC",
-            labels={"x": "ICC", "y": "Design Effect"}
+        fig = _build_deff_fig(results['cluster_size'])
+        st.plotly_chart(fig, use_container_width=True)
+
+        # ICC x cluster size scenario sweep
+        fig = _build_sensitivity_heatmap(
+            params.confidence_level,
+            params.expected_prevalence,
+            params.margin_error,
+            params.population_size,
+            params.non_response_rate
         )
         st.plotly_chart(fig, use_container_width=True)
 
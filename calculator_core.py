@@ -1,11 +1,65 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from functools import lru_cache
+from statistics import NormalDist
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 import math
-from statsmodels.stats.power import TTestIndPower # type: ignore
 import json
 import os
+import numpy as np
 
-@dataclass
+try:
+    import orjson # type: ignore
+except ImportError:
+    orjson = None
+
+# Two-sided critical values at full precision, e.g. 95 -> 1.95996...
+_Z_TABLE: Mapping[int, float] = MappingProxyType({
+    level: NormalDist().inv_cdf(1 - (1 - level / 100) / 2)
+    for level in (90, 95, 99)
+})
+
+@lru_cache(maxsize=None)
+def _power_analysis():
+    """TTestIndPower, imported on first use to keep statsmodels off cold start"""
+    from statsmodels.stats.power import TTestIndPower # type: ignore
+    return TTestIndPower()
+
+@lru_cache(maxsize=512)
+def _solve_ttest_power(effect_size: float, alpha: float, power: float) -> float:
+    """Memoized two-sample t-test sample size (slider inputs repeat often)"""
+    from scipy.optimize import brentq # type: ignore
+    analysis = _power_analysis()
+
+    # Normal approximation per group: n = 2 * ((z_{1-a/2} + z_{1-b}) / d)^2.
+    # The t-test always needs slightly more, so it brackets the exact root.
+    z = NormalDist().inv_cdf
+    n_approx = 2 * ((z(1 - alpha / 2) + z(power)) / effect_size) ** 2
+
+    def shortfall(nobs1: float) -> float:
+        return analysis.power(effect_size=effect_size, nobs1=nobs1, alpha=alpha) - power
+
+    try:
+        return brentq(shortfall, max(n_approx, 2.0), 1.5 * n_approx + 2.0)
+    except ValueError:
+        # Bracket did not straddle the root; use the statsmodels search
+        return analysis.solve_power(
+            effect_size=effect_size,
+            nobs1=None,
+            alpha=alpha,
+            power=power
+        )
+
+@lru_cache(maxsize=None)
+def _load_survey_profiles(path: str) -> List[Dict]:
+    """Parse the survey profiles JSON once per process"""
+    if orjson is None:
+        with open(path) as f:
+            return json.load(f)
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+@dataclass(frozen=True, slots=True)
 class SurveyParameters:
     survey_type: str
     population_size: int
@@ -21,14 +75,17 @@ class SurveyParameters:
 
 class ESSSampleSizeCalculator:
     def __init__(self):
-        self.confidence_levels = {90: 1.645, 95: 1.96, 99: 2.576}
+        self.confidence_levels: Mapping[int, float] = _Z_TABLE
+        # Per-instance cache: keyed on params only, cleared on profile reload
+        self._calculate_sample_cached = lru_cache(maxsize=64)(self._calculate_sample_uncached)
         self.load_survey_profiles()
         
     def load_survey_profiles(self):
         """Load survey profiles from JSON file"""
         try:
-            with open(os.path.join('assets', 'survey_types.json')) as f:
-                self.survey_profiles = json.load(f)
+            self.survey_profiles = _load_survey_profiles(
+                os.path.join('assets', 'survey_types.json')
+            )
         except:
             # Defaults if file missing
             self.survey_profiles = [
@@ -41,6 +98,14 @@ class ESSSampleSizeCalculator:
                 }
                 # ... other survey types
             ]
+        self._profile_by_id = {p['id']: p for p in self.survey_profiles}
+        self._survey_types_ui = tuple({
+            'id': p['id'],
+            'name': p['name'],
+            'description': p.get('description', '')
+        } for p in self.survey_profiles)
+        # Cached results were built from the previous profile defaults
+        self._calculate_sample_cached.cache_clear()
 
     def calculate_deff(self, avg_cluster_size: int, icc: float) -> float:
         """Design effect for cluster sampling (1 + (b-1)*icc)"""
@@ -48,18 +113,24 @@ class ESSSampleSizeCalculator:
 
     def calculate_power(self, effect_size: float, alpha: float, power: float) -> float:
         """Statistical power calculation"""
-        analysis = TTestIndPower()
-        return analysis.solve_power(
-            effect_size=effect_size,
-            nobs1=None,
-            alpha=alpha,
-            power=power
+        # Round to collapse float jitter from the sliders into stable cache keys
+        return _solve_ttest_power(
+            round(effect_size, 4),
+            round(alpha, 4),
+            round(power, 4)
         )
 
     def calculate_sample(self, params: SurveyParameters) -> Dict:
         """Comprehensive sample size calculation"""
+        # Copy so callers cannot mutate the cached result
+        return dict(self._calculate_sample_cached(params))
+
+    def _calculate_sample_uncached(self, params: SurveyParameters) -> Dict:
+        """Memoized per instance on the (hashable, frozen) parameters"""
+        ceil = math.ceil
+
         # Get survey defaults
-        profile = next(p for p in self.survey_profiles if p['id'] == params.survey_type)
+        profile = self._profile_by_id[params.survey_type]
         icc = params.icc or profile['default_icc']
         b = params.avg_cluster_size or profile['default_cluster_size']
         
@@ -79,30 +150,54 @@ class ESSSampleSizeCalculator:
                 params.power
             )
 
+        ps = ceil(power_sample) if power_sample is not None else None
+        n0_ceil = ceil(n0)
+        # deff and icc are raw floats; rounding is left to the presentation layer
         return {
-            'base_sample_size': math.ceil(n0),
-            'design_effect': round(deff, 3),
-            'icc': round(icc, 3),
+            'base_sample_size': n0_ceil,
+            'design_effect': deff,
+            'icc': icc,
             'cluster_size': b,
-            'adjusted_sample_size': math.ceil(n_design),
-            'final_sample_size': math.ceil(final_n),
-            'power_sample_size': math.ceil(power_sample) if power_sample else None,
-            'effective_sample_size': math.ceil(n0)
+            'adjusted_sample_size': ceil(n_design),
+            'final_sample_size': ceil(final_n),
+            'power_sample_size': ps,
+            'effective_sample_size': n0_ceil
+        }
+
+    def calculate_sample_batch(self, Z, p, me, b, icc, N, nr) -> Dict[str, np.ndarray]:
+        """Vectorized sample size pipeline over broadcastable arrays"""
+        Z, p, me, b, icc, N, nr = (
+            np.asarray(x, dtype=float) for x in (Z, p, me, b, icc, N, nr)
+        )
+        n0 = Z*Z * p * (1.0 - p) / (me*me)
+        deff = 1.0 + (b - 1.0) * icc
+        n_design = n0 * deff
+        n_fpc = np.where(
+            N > 0, np.minimum(n_design * N / (N + n_design - 1.0), N), n_design
+        )
+        final_n = np.ceil(n_fpc / (1.0 - nr))
+        return {
+            'n0': n0,
+            'deff': deff,
+            'n_design': n_design,
+            'n_fpc': n_fpc,
+            'final_n': final_n
         }
 
     def _calculate_base_sample(self, params: SurveyParameters) -> float:
         """Base sample size calculation"""
-        Z = self.confidence_levels[params.confidence_level]
-        return (Z**2 * params.expected_prevalence * (1 - params.expected_prevalence)) / (params.margin_error**2)
+        z_table = _Z_TABLE
+        Z = z_table[params.confidence_level]
+        p = params.expected_prevalence
+        me = params.margin_error
+        return (Z*Z * p * (1.0 - p)) / (me*me)
 
     def _apply_fpc(self, n: float, N: int) -> float:
-        """Finite population correction"""
-        return n / (1 + (n - 1)/N) if N else n
+        """Finite population correction, n * N / (N + n - 1)"""
+        # Same as the classic n / (1 + (n - 1)/N): multiply through by N/N.
+        # Clamp to N: (N + n) - 1.0 need not round back to n (e.g. N = 1).
+        return n if not N else min((n * N) / (N + n - 1.0), N)
 
-    def get_survey_types(self) -> List[Dict]:
+    def get_survey_types(self) -> Tuple[Dict, ...]:
         """Available survey types for UI"""
-        return [{
-            'id': p['id'],
-            'name': p['name'],
-            'description': p.get('description', '')
-        } for p in self.survey_profiles]
\ No newline at end of file
+        return self._survey_types_ui
\ No newline at end of file